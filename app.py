@@ -74,6 +74,16 @@ def get_price_history(pid):
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
+@app.route('/api/feed')
+def get_news_feed():
+    if 'user_id' not in session: return jsonify({"error": "Unauthorized"}), 401
+    try:
+        df, next_cursor = db_manager.get_user_feed(session['user_id'], request.args.get('before', type=int))
+        df['published_at'] = pd.to_datetime(df['published_at']).dt.strftime('%Y-%m-%d %H:%M')
+        return jsonify({"items": df.to_dict('records'), "next_cursor": next_cursor})
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
 @app.route('/dashboard')
 def dashboard():
     if 'user_id' not in session: return redirect(url_for('login'))
@@ -113,23 +123,29 @@ def dashboard():
         all_items.sort(key=lambda x: (not x['is_deal'], x['pname']))
         active_deals = [x for x in all_items if x['is_deal']]
 
-        # News
-        news_data = db_manager.run_query("SELECT category, title, n_url, image_url, published_at FROM News ORDER BY published_at DESC LIMIT 100")
+        # News: one page of the user's precomputed feed (filled by db_manager.add_news).
+        # Unmatched global stories are only shown (and paged) while the feed is empty.
+        before = request.args.get('before', type=int)
+        news_data, next_cursor = db_manager.get_user_feed(uid, before)
+        if news_data.empty:
+            # Nothing matched the watchlist yet, page through the latest deals instead
+            news_data, next_cursor = db_manager.get_latest_news(before)
         raw_news = news_data.to_dict('records') if not news_data.empty else []
         
-        user_keywords = [str(i['pname']).split()[0].lower() for i in all_items]
+        # Feed rows already carry their match; fallback rows are checked with the same keyword rule
+        user_keywords = [k for k in (db_manager.product_keyword(i['pname']) for i in all_items) if k]
         processed_news = []
         for news in raw_news:
             t = str(news['title']).lower()
+            if pd.isna(news['match_reason']): is_match = any(k in t for k in user_keywords)
+            else: is_match = news['match_reason'] == 'product'
             tag = "AMAZON DEAL"
-            if any(k in t for k in user_keywords if len(k)>3): tag = "WATCHLIST OFFER"
+            if is_match: tag = "WATCHLIST OFFER"
             elif any(x in t for x in ['prime', 'sale', 'deal']): tag = "UPCOMING SALE"
             news['tag'] = tag
             if not news['image_url']: news['image_url'] = "https://upload.wikimedia.org/wikipedia/commons/a/a9/Amazon_logo.svg"
             processed_news.append(news)
-            
-        priority_map = {"WATCHLIST OFFER": 1, "UPCOMING SALE": 2, "AMAZON DEAL": 3}
-        processed_news.sort(key=lambda x: priority_map.get(x['tag'], 3))
+        # No re-sort by tag: pages stay newest-first so the 'before' cursor lines up with what is shown
 
         user_df = db_manager.run_query("SELECT fname, lname, email FROM Users WHERE uid=%s", (uid,))
         if user_df.empty: session.clear(); return redirect(url_for('login'))
@@ -137,7 +153,8 @@ def dashboard():
 
         return render_template('dashboard.html', 
                                watchlist=all_items, 
-                               news_items=processed_news[:60], 
+                               news_items=processed_news, 
+                               next_cursor=next_cursor, 
                                user_info=user_info, 
                                active_tab=active_tab,
                                deal_count=len(active_deals))
@@ -151,29 +168,36 @@ def trigger_news():
     # Use requests for RSS (Simpler than Cloudscraper)
     HEADERS = {'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) Chrome/91.0.4472.124 Safari/537.36'}
     count = 0
+    conn = None
     try:
+        # Fetch and parse every source first so no transaction is open during network I/O
+        stories = []
         for cat, url in RSS_SOURCES.items():
             try:
                 resp = requests.get(url, headers=HEADERS, timeout=10)
                 if resp.status_code == 200:
                     feed = feedparser.parse(resp.content)
                     for entry in feed.entries[:10]:
-                        if db_manager.run_query("SELECT nid FROM News WHERE n_url=%s", (entry.link,)).empty:
-                            img_url = None
-                            if 'media_content' in entry: img_url = entry.media_content[0]['url']
-                            elif 'media_thumbnail' in entry: img_url = entry.media_thumbnail[0]['url']
-                            else:
-                                m = re.search(r'<img[^>]+src="([^">]+)"', entry.get('summary', ''))
-                                if m: img_url = m.group(1)
-                            clean_title = entry.title.encode('ascii', 'ignore').decode('ascii')
-                            db_manager.execute_command(
-                                "INSERT INTO News (category, title, n_url, image_url) VALUES (%s, %s, %s, %s)",
-                                (cat, clean_title, entry.link, img_url)
-                            )
-                            count += 1
+                        img_url = None
+                        if 'media_content' in entry: img_url = entry.media_content[0]['url']
+                        elif 'media_thumbnail' in entry: img_url = entry.media_thumbnail[0]['url']
+                        else:
+                            m = re.search(r'<img[^>]+src="([^">]+)"', entry.get('summary', ''))
+                            if m: img_url = m.group(1)
+                        clean_title = entry.title.encode('ascii', 'ignore').decode('ascii')
+                        stories.append((cat, clean_title, entry.link, img_url))
             except: pass
+        
+        # One connection, one commit per story (add_news skips known URLs and fans out new ones)
+        conn = db_manager.get_connection()
+        for cat, title, link, img_url in stories:
+            try:
+                if db_manager.add_news(cat, title, link, img_url, conn=conn): count += 1
+            except Exception as e: logger.warning(f"[{session_id}] News insert failed for {link}: {e}")
         flash(f"Refreshed! Found {count} new deals.", "success")
     except Exception as e: flash(f"Error: {e}", "danger")
+    finally:
+        if conn: conn.close()
     return redirect(url_for('dashboard', active_tab='news'))
 
 @app.route('/user/create_product', methods=['POST'])
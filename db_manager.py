@@ -12,6 +12,33 @@ DB_CONFIG = {
     "database": os.getenv("DB_NAME", "dealradar")
 }
 
+# Per-user news feed (User_News) is filled when news is written, so reads are one range scan
+FEED_LIMIT = 200
+# Feeds may overshoot FEED_LIMIT by this much before trimming, so a trim runs once per batch of stories
+FEED_TRIM_SLACK = 50
+FEED_PAGE_SIZE = 20
+
+# A watcher matches news on the first word of a watched product's name (same
+# keyword rule the dashboard uses) appearing in the title, or on the product's
+# category. Higher rank wins when a story matches a user more than one way.
+# Note: scraped products all get p_category='Amazon Import' while News.category holds
+# RSS source names, so in practice only the keyword match fires today.
+MATCH_CATEGORY = 1
+MATCH_PRODUCT = 2
+MATCH_REASONS = {MATCH_CATEGORY: 'category', MATCH_PRODUCT: 'product'}
+
+def product_keyword(pname):
+    """Python twin of the keyword in _match_rank_sql: first space-separated word, lowercased, if longer than 3 chars."""
+    keyword = str(pname).split(' ', 1)[0].lower()
+    return keyword if len(keyword) > 3 else None
+
+def _match_rank_sql(title, category):
+    keyword = "LOWER(SUBSTRING_INDEX(p.pname, ' ', 1))"
+    return f"""
+    CASE WHEN CHAR_LENGTH({keyword}) > 3 AND LOCATE({keyword}, LOWER({title})) > 0 THEN {MATCH_PRODUCT}
+         WHEN p.p_category = {category} THEN {MATCH_CATEGORY}
+    END"""
+
 def get_connection():
     return pymysql.connect(**DB_CONFIG)
 
@@ -53,15 +80,31 @@ def get_or_create_product(pname, description, category, msrp, url):
     return new_id, True
 
 def add_to_cart(uid, pid, cutoff):
-    exists = run_query("SELECT cid FROM Cart WHERE uid=%s AND pid=%s", (uid, pid))
-    if exists.empty:
-        execute_command("INSERT INTO Cart (uid, pid, cutoff) VALUES (%s, %s, %s)", (uid, pid, cutoff))
+    conn = get_connection()
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute("SELECT cid FROM Cart WHERE uid=%s AND pid=%s", (uid, pid))
+            if cursor.fetchone(): return
+            cursor.execute("INSERT INTO Cart (uid, pid, cutoff) VALUES (%s, %s, %s)", (uid, pid, cutoff))
+            _backfill_feed(cursor, uid, pid)
+        conn.commit()
+    finally:
+        conn.close()
 
 def update_cart_target(cid, new_cutoff):
     execute_command("UPDATE Cart SET cutoff=%s WHERE cid=%s", (new_cutoff, cid))
 
 def delete_from_cart(cid):
-    execute_command("DELETE FROM Cart WHERE cid=%s", (cid,))
+    conn = get_connection()
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute("SELECT uid, pid FROM Cart WHERE cid=%s", (cid,))
+            row = cursor.fetchone()
+            cursor.execute("DELETE FROM Cart WHERE cid=%s", (cid,))
+            if row: _drop_product_from_feed(cursor, *row)
+        conn.commit()
+    finally:
+        conn.close()
 
 def create_user(fname, lname, email, password):
     try:
@@ -70,4 +113,144 @@ def create_user(fname, lname, email, password):
     except: return False
         
 def delete_product(pid):
-    execute_command("DELETE FROM Product WHERE pid=%s", (pid,))
\ No newline at end of file
+    conn = get_connection()
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute("SELECT DISTINCT uid FROM Cart WHERE pid=%s", (pid,))
+            watchers = [uid for (uid,) in cursor.fetchall()]
+            cursor.execute("DELETE FROM Product WHERE pid=%s", (pid,))
+            for uid in watchers: _drop_product_from_feed(cursor, uid, pid)
+        conn.commit()
+    finally:
+        conn.close()
+
+# Keeps the product that earned a feed row, upgrading it when a stronger match arrives
+_FEED_UPSERT = "ON DUPLICATE KEY UPDATE pid = IF(new_rank > match_rank, new_pid, pid), match_rank = GREATEST(match_rank, new_rank)"
+
+def _trim_feeds(cursor, uids):
+    """Cuts back to FEED_LIMIT only the feeds that grew past FEED_LIMIT + FEED_TRIM_SLACK."""
+    if not uids: return
+    cursor.execute(
+        "SELECT uid FROM User_News WHERE uid IN %s GROUP BY uid HAVING COUNT(*) > %s",
+        (tuple(uids), FEED_LIMIT + FEED_TRIM_SLACK)
+    )
+    for (uid,) in cursor.fetchall():
+        cursor.execute("""
+            DELETE FROM User_News WHERE uid=%s AND nid < (
+                SELECT nid FROM (
+                    SELECT nid FROM User_News WHERE uid=%s ORDER BY nid DESC LIMIT 1 OFFSET %s
+                ) AS oldest_kept
+            )""", (uid, uid, FEED_LIMIT - 1))
+
+def _insert_news(cursor, category, title, url, image_url):
+    cursor.execute("SELECT nid FROM News WHERE n_url=%s", (url,))
+    if cursor.fetchone(): return None
+    cursor.execute(
+        "INSERT INTO News (category, title, n_url, image_url) VALUES (%s, %s, %s, %s)",
+        (category, title, url, image_url)
+    )
+    nid = cursor.lastrowid
+
+    cursor.execute(f"""
+        SELECT uid, pid, match_rank FROM (
+            SELECT c.uid, c.pid, {_match_rank_sql("%s", "%s")} AS match_rank
+            FROM Cart c JOIN Product p ON c.pid = p.pid
+        ) m WHERE match_rank IS NOT NULL
+    """, (title, category))
+    matches = cursor.fetchall()
+    watchers = {uid for uid, _, _ in matches}
+    if matches:
+        cursor.executemany(f"""
+            INSERT INTO User_News (uid, nid, pid, match_rank)
+            SELECT * FROM (SELECT %s AS uid, %s AS nid, %s AS new_pid, %s AS new_rank) AS picked
+            {_FEED_UPSERT}
+        """, [(uid, nid, pid, rank) for uid, pid, rank in matches])
+    _trim_feeds(cursor, watchers)
+    return nid
+
+def add_news(category, title, url, image_url=None, conn=None):
+    """Inserts a News row and fans it out to every matching watcher's feed.
+    Returns the new nid, or None if the URL is already stored.
+    Each story is its own transaction; batch ingests may pass `conn` to reuse one connection."""
+    own_conn = conn is None
+    if own_conn: conn = get_connection()
+    try:
+        with conn.cursor() as cursor:
+            nid = _insert_news(cursor, category, title, url, image_url)
+        # Commit even for duplicates so the next dedup check reads a fresh snapshot
+        conn.commit()
+        return nid
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        if own_conn: conn.close()
+
+def _backfill_feed(cursor, uid, pid):
+    """Seeds a user's feed with stored news matching a newly watched product."""
+    cursor.execute(f"""
+        INSERT INTO User_News (uid, nid, pid, match_rank)
+        SELECT * FROM (
+            SELECT %s AS uid, nid, new_pid, new_rank FROM (
+                SELECT n.nid, p.pid AS new_pid, {_match_rank_sql("n.title", "n.category")} AS new_rank
+                FROM News n JOIN Product p ON p.pid = %s
+            ) m WHERE new_rank IS NOT NULL
+            ORDER BY nid DESC LIMIT %s
+        ) AS picked
+        {_FEED_UPSERT}
+    """, (uid, pid, FEED_LIMIT))
+    _trim_feeds(cursor, [uid])
+
+def _drop_product_from_feed(cursor, uid, pid):
+    """Removes feed rows earned by a product the user stopped watching.
+    Rows that still match another watched product are re-added under it."""
+    cursor.execute("SELECT nid FROM User_News WHERE uid=%s AND pid=%s", (uid, pid))
+    nids = tuple(nid for (nid,) in cursor.fetchall())
+    if not nids: return
+    cursor.execute("DELETE FROM User_News WHERE uid=%s AND pid=%s", (uid, pid))
+    cursor.execute(f"""
+        INSERT INTO User_News (uid, nid, pid, match_rank)
+        SELECT * FROM (
+            SELECT %s AS uid, nid, new_pid, new_rank FROM (
+                SELECT n.nid, c.pid AS new_pid, {_match_rank_sql("n.title", "n.category")} AS new_rank
+                FROM News n JOIN Cart c ON c.uid = %s JOIN Product p ON p.pid = c.pid
+                WHERE n.nid IN %s
+            ) m WHERE new_rank IS NOT NULL
+        ) AS picked
+        {_FEED_UPSERT}
+    """, (uid, uid, nids))
+
+def _fetch_page(sql, params, cursor_col, before, limit):
+    """Runs a newest-first nid query with an optional 'before' cursor on `cursor_col`.
+    `sql` has a {cursor_clause} slot and ends in LIMIT %s; returns (df, next_cursor)."""
+    # One extra row tells us whether an older page exists
+    if before is None:
+        df = run_query(sql.format(cursor_clause=""), (*params, limit + 1))
+    else:
+        df = run_query(sql.format(cursor_clause=f"AND {cursor_col} < %s"), (*params, before, limit + 1))
+    if len(df) <= limit: return df, None
+    df = df.iloc[:limit]
+    return df, int(df.iloc[-1]['nid'])
+
+def get_user_feed(uid, before=None, limit=FEED_PAGE_SIZE):
+    """Returns (news_df, next_cursor) for one page of the user's feed, newest first.
+    Pass next_cursor back as `before` to get the following page; it is None on the last page."""
+    sql = """
+    SELECT n.nid, n.category, n.title, n.n_url, n.image_url, n.published_at, un.match_rank
+    FROM User_News un JOIN News n ON n.nid = un.nid
+    WHERE un.uid = %s {cursor_clause}
+    ORDER BY un.nid DESC LIMIT %s
+    """
+    df, next_cursor = _fetch_page(sql, (uid,), "un.nid", before, limit)
+    df['match_reason'] = df['match_rank'].map(MATCH_REASONS)
+    return df, next_cursor
+
+def get_latest_news(before=None, limit=FEED_PAGE_SIZE):
+    """Same paging as get_user_feed, over all stored news (match_reason is None)."""
+    sql = """
+    SELECT n.nid, n.category, n.title, n.n_url, n.image_url, n.published_at, NULL AS match_reason
+    FROM News n
+    WHERE 1=1 {cursor_clause}
+    ORDER BY n.nid DESC LIMIT %s
+    """
+    return _fetch_page(sql, (), "n.nid", before, limit)
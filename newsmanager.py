@@ -1,17 +1,5 @@
-import pymysql
 import feedparser
-import os
-from dotenv import load_dotenv
-
-load_dotenv()
-
-# Database Config
-DB_CFG = {
-    "host": os.getenv("DB_HOST", "localhost"),
-    "user": os.getenv("DB_USER", "root"),
-    "password": os.getenv("DB_PASSWORD", ""),
-    "database": os.getenv("DB_NAME", "dealradar")
-}
+import db_manager
 
 # 1. THE SOURCE: Real RSS Feeds mapped to our Categories
 RSS_SOURCES = {
@@ -22,32 +10,29 @@ RSS_SOURCES = {
 
 def update_news_feed():
     """Run this function once every few hours to fill the DB with fresh news."""
-    conn = pymysql.connect(**DB_CFG)
-    cursor = conn.cursor()
-    
     print("[LOG] Fetching latest news...")
     
+    # Fetch every feed before touching the DB so no transaction waits on the network
+    stories = []
     for category, url in RSS_SOURCES.items():
         try:
             feed = feedparser.parse(url)
             # Take top 3 stories from each feed
             for entry in feed.entries[:3]:
-                title = entry.title
-                link = entry.link
-                
-                # Insert if not exists (Avoid duplicates based on URL)
-                sql = """
-                INSERT INTO News (category, title, n_url) 
-                SELECT %s, %s, %s 
-                WHERE NOT EXISTS (SELECT 1 FROM News WHERE n_url = %s)
-                """
-                cursor.execute(sql, (category, title, link, link))
-                
+                stories.append((category, entry.title, entry.link))
         except Exception as e:
             print(f"Error fetching {category}: {e}")
-            
-    conn.commit()
-    conn.close()
+    
+    conn = db_manager.get_connection()
+    try:
+        for category, title, link in stories:
+            try:
+                # Insert if not exists (Avoid duplicates based on URL) and fan out to watcher feeds
+                db_manager.add_news(category, title, link, conn=conn)
+            except Exception as e:
+                print(f"Error saving {link}: {e}")
+    finally:
+        conn.close()
     print("[LOG] News database updated.")
 
 def get_relevant_news_for_user(user_id):
@@ -55,27 +40,10 @@ def get_relevant_news_for_user(user_id):
     MAGIC FUNCTION: Finds news based on what products the user is watching.
     No manual setup required by the user!
     """
-    conn = pymysql.connect(**DB_CFG)
-    cursor = conn.cursor()
-    
-    # LOGIC: 
-    # 1. Look at Cart to find Product Categories
-    # 2. Find News that matches those Categories
-    sql = """
-    SELECT DISTINCT n.category, n.title, n.n_url, n.published_at
-    FROM News n
-    JOIN Product p ON n.category = p.p_category
-    JOIN Cart c ON p.pid = c.pid
-    WHERE c.uid = %s
-    ORDER BY n.published_at DESC
-    LIMIT 10;
-    """
-    
-    cursor.execute(sql, (user_id,))
-    results = cursor.fetchall()
-    conn.close()
-    
-    return results
+    # Matching happens when news is stored (see db_manager.add_news),
+    # so this is just the first page of the user's precomputed feed.
+    news, _ = db_manager.get_user_feed(user_id, limit=10)
+    return list(news[['category', 'title', 'n_url', 'published_at']].itertuples(index=False, name=None))
 
 # --- TEST RUN ---
 if __name__ == "__main__":
@@ -80,6 +80,21 @@ CREATE TABLE News (
     published_at DATETIME DEFAULT CURRENT_TIMESTAMP
 );
 
+-- Per-user news feed, filled on News insert (fan-out on write).
+-- (uid, nid) primary key makes a feed page a single range read.
+-- pid is the watched product that earned the row, so unwatching can remove it.
+-- Each user keeps about the newest FEED_LIMIT rows (see db_manager).
+CREATE TABLE User_News (
+    uid INT,
+    nid INT,
+    pid INT,
+    match_rank TINYINT,
+    added_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (uid, nid),
+    FOREIGN KEY (uid) REFERENCES Users(uid) ON DELETE CASCADE,
+    FOREIGN KEY (nid) REFERENCES News(nid) ON DELETE CASCADE
+);
+
 -- 3. STORED PROCEDURE & TRIGGER
 DELIMITER //
 
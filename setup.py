@@ -20,7 +20,7 @@ try:
 
     print("[LOG] Resetting Tables...")
     cursor.execute("SET FOREIGN_KEY_CHECKS = 0;")
-    objects = ["Alerts", "Cart", "Seller_Prices", "Sellers", "Product", "News", "Users"]
+    objects = ["Alerts", "User_News", "Cart", "Seller_Prices", "Sellers", "Product", "News", "Users"]
     for obj in objects: cursor.execute(f"DROP TABLE IF EXISTS {obj};")
     cursor.execute("DROP PROCEDURE IF EXISTS InsertPrice;")
     cursor.execute("DROP TRIGGER IF EXISTS AfterPriceInsert;")
@@ -65,6 +65,13 @@ try:
             category VARCHAR(100), title VARCHAR(255), n_url VARCHAR(500),
             image_url TEXT,
             published_at DATETIME DEFAULT CURRENT_TIMESTAMP
+        );""",
+        """CREATE TABLE User_News (
+            uid INT, nid INT, pid INT,
+            match_rank TINYINT, added_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+            PRIMARY KEY (uid, nid),
+            FOREIGN KEY (uid) REFERENCES Users(uid) ON DELETE CASCADE,
+            FOREIGN KEY (nid) REFERENCES News(nid) ON DELETE CASCADE
         );"""
     ]
 